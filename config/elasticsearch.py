@@ -2,11 +2,63 @@
 Elasticsearch connection and configuration utilities
 """
 import os
+import threading
+from typing import Any, List, Optional
+import orjson
 from elasticsearch import Elasticsearch
+from elasticsearch.serializer import JsonSerializer, NdjsonSerializer
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# numpy arrays are serialized natively; non-string keys are stringified
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    JSON serializer backed by orjson
+    
+    Serializes numpy arrays natively, so embedding vectors can be sent
+    to Elasticsearch without converting them to Python lists first.
+    """
+    
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+    
+    def dumps(self, data: Any) -> bytes:
+        if isinstance(data, str):
+            return data.encode("utf-8", "surrogatepass")
+        if isinstance(data, bytes):
+            return data
+        return orjson.dumps(data, default=self.default, option=_ORJSON_OPTIONS)
+
+
+class OrjsonNdjsonSerializer(NdjsonSerializer):
+    """
+    NDJSON serializer backed by orjson
+    
+    Used for bulk and msearch bodies, which carry one vector per document
+    or per search.
+    """
+    
+    def loads(self, data: bytes) -> List[Any]:
+        return [orjson.loads(line) for line in data.splitlines() if line.strip()]
+    
+    def dumps(self, data: Any) -> bytes:
+        if not isinstance(data, (list, tuple)):
+            data = [data]
+        buffer = bytearray()
+        for line in data:
+            if isinstance(line, str):
+                line = line.encode("utf-8", "surrogatepass")
+            elif not isinstance(line, bytes):
+                line = orjson.dumps(line, default=self.default, option=_ORJSON_OPTIONS)
+            buffer += line
+            if not line.endswith(b"\n"):
+                buffer += b"\n"
+        return bytes(buffer)
+
 
 class ElasticsearchConfig:
     """Configuration for Elasticsearch connection"""
@@ -16,39 +68,87 @@ class ElasticsearchConfig:
         self.cloud_id = os.getenv("ELASTICSEARCH_CLOUD_ID")
         self.api_key = os.getenv("ELASTICSEARCH_API_KEY")
         self.index_name = os.getenv("INDEX_NAME", "products_vector_search")
+        # Result caches in front of Elasticsearch. RESULT_CACHE_TTL bounds how
+        # stale any result can be (so stock changes show up); the semantic
+        # cache TTL is capped to it, see CachedSearch
+        self.result_cache_size = int(os.getenv("RESULT_CACHE_SIZE", 1024))
+        self.result_cache_ttl = float(os.getenv("RESULT_CACHE_TTL", 60))
+        # Semantic result cache (see src/search/semantic_cache.py)
+        self.semantic_cache_size = int(os.getenv("SEMANTIC_CACHE_SIZE", 256))
+        self.semantic_cache_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.97))
+        self.semantic_cache_ttl = float(os.getenv("SEMANTIC_CACHE_TTL", 60))
+        self._client: Optional[Elasticsearch] = None
+        self._client_lock = threading.Lock()
         
     def get_client(self) -> Elasticsearch:
         """
-        Create and return Elasticsearch client
+        Return the shared Elasticsearch client, creating it on first use
+        
+        The client keeps a pool of persistent connections and gzip-compresses
+        request bodies, so every caller reuses the same connections.
         
         Returns:
             Elasticsearch client instance
         """
+        if self._client is None:
+            # Searchers may be created from several threads; build only once
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+    
+    def _create_client(self) -> Elasticsearch:
+        """Create a pooled, compressed Elasticsearch client"""
+        options = {
+            "serializers": {
+                "application/json": OrjsonSerializer(),
+                "application/x-ndjson": OrjsonNdjsonSerializer()
+            },
+            "http_compress": True,
+            "request_timeout": 30,
+            "max_retries": 3,
+            "retry_on_timeout": True,
+            "connections_per_node": 10
+        }
         if self.cloud_id and self.api_key:
             # Elastic Cloud connection
             return Elasticsearch(
                 cloud_id=self.cloud_id,
-                api_key=self.api_key
+                api_key=self.api_key,
+                **options
             )
         else:
             # Local connection
             return Elasticsearch(
                 hosts=[self.url],
-                verify_certs=False
+                verify_certs=False,
+                **options
             )
     
-    def test_connection(self) -> bool:
+    def test_connection(self, verbose: bool = False) -> bool:
         """
         Test Elasticsearch connection
         
+        Uses a lightweight HEAD ping; the full cluster info() call is only
+        made when verbose output is requested.
+        
+        Args:
+            verbose: Also fetch and print the cluster version
+        
         Returns:
             True if connection successful, False otherwise
         """
         try:
             client = self.get_client()
-            info = client.info()
-            print(f"✅ Connected to Elasticsearch {info['version']['number']}")
-            return True
+            if verbose:
+                info = client.info()
+                print(f"✅ Connected to Elasticsearch {info['version']['number']}")
+                return True
+            if client.ping():
+                print("✅ Connected to Elasticsearch")
+                return True
+            print("❌ Connection failed: cluster did not respond to ping")
+            return False
         except Exception as e:
             print(f"❌ Connection failed: {str(e)}")
             return False
@@ -3,6 +3,8 @@ Convert blog post from Markdown to DOCX with embedded images
 """
 import re
 import os
+import mmap
+from contextlib import nullcontext
 from pathlib import Path
 import subprocess
 import shutil
@@ -12,6 +14,10 @@ import sys
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
+# Markdown image reference: ![alt text](path)
+IMG_RE = re.compile(rb'!\[([^\]]*)\]\(([^\)]+)\)')
+
+
 def convert_md_to_docx_with_images():
     """Convert markdown to DOCX and embed images"""
     
@@ -31,21 +37,12 @@ def convert_md_to_docx_with_images():
     
     print(f"\nFound {blog_file}")
     
-    # Read the markdown content
-    with open(blog_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find all image references
-    image_pattern = r'!\[([^\]]*)\]\(([^\)]+)\)'
-    images = re.findall(image_pattern, content)
-    
-    print(f"Found {len(images)} image(s)")
-    
     # Update image paths to absolute paths
-    updated_content = content
     base_dir = os.path.abspath(os.path.dirname(__file__))
     
-    for alt_text, img_path in images:
+    def resolve_image(match):
+        alt_text = match.group(1).decode('utf-8')
+        img_path = match.group(2).decode('utf-8')
         # Convert relative path to absolute
         if not os.path.isabs(img_path):
             abs_path = os.path.join(base_dir, img_path.replace('./', ''))
@@ -53,15 +50,29 @@ def convert_md_to_docx_with_images():
             
             if os.path.exists(abs_path):
                 print(f"   OK: {os.path.basename(img_path)}")
-                # Replace in content
-                old_ref = f'![{alt_text}]({img_path})'
-                new_ref = f'![{alt_text}]({abs_path})'
-                updated_content = updated_content.replace(old_ref, new_ref)
+                return f'![{alt_text}]({abs_path})'.encode('utf-8')
             else:
                 print(f"   Warning: {img_path} not found")
+        return match.group(0)
+    
+    # Map the markdown file read-only and scan its bytes in place
+    # (an empty file can't be mapped, so fall back to empty content)
+    with open(blog_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            mapping = nullcontext(b'')
+        
+        with mapping as content:
+            # Find all image references
+            images = IMG_RE.findall(content)
+            print(f"Found {len(images)} image(s)")
+            
+            # Rewrite every reference in a single pass over the content
+            updated_content = IMG_RE.sub(resolve_image, content)
     
     # Write temporary file with updated paths
-    with open(temp_file, 'w', encoding='utf-8') as f:
+    with open(temp_file, 'wb') as f:
         f.write(updated_content)
     
     # Check for pandoc
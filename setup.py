@@ -3,7 +3,7 @@ Setup script to index sample products into Elasticsearch
 """
 import sys
 import os
-import json
+import orjson
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
@@ -13,8 +13,8 @@ from config.elasticsearch import es_config
 
 def load_products(file_path: str):
     """Load products from JSON file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 def main():
@@ -53,7 +53,7 @@ def main():
     
     # Create indexer
     print("\n3️⃣ Creating Elasticsearch index with vector capabilities...")
-    indexer = ProductIndexer()
+    indexer = ProductIndexer(verbose=True)
     
     try:
         indexer.create_index()
@@ -84,7 +84,7 @@ def main():
     print(f"\n🎉 You can now run the agent:")
     print(f"   python src/app.py")
     print(f"\n   Or test search directly:")
-    print(f"   python src/search/hybrid_search.py")
+    print(f"   python -m src.search.hybrid_search")
     print("="*80 + "\n")
 
 
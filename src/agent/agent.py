@@ -2,19 +2,20 @@
 Intelligent search agent using LLM for query understanding and response generation
 """
 import os
-import json
-from typing import List, Dict, Any, Optional
+import copy
+import orjson
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Deque
 import google.generativeai as genai
 from dotenv import load_dotenv
-import sys
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.search.hybrid_search import HybridSearch
+from src.agent.filter_rules import extract_filters
 from src.agent.prompts import (
-    QUERY_UNDERSTANDING_PROMPT,
-    RESPONSE_GENERATION_PROMPT,
-    CONVERSATION_CONTEXT_PROMPT
+    CONVERSATION_CONTEXT_PROMPT,
+    render_query_understanding,
+    render_response_generation
 )
 
 load_dotenv()
@@ -41,11 +42,17 @@ class SearchAgent:
         )
         
         # Initialize search engine
-        self.searcher = HybridSearch()
+        self.searcher = HybridSearch(warmup=True)
+        # Background worker that embeds the query while the LLM call runs
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        
+        # LLM query analyses keyed by normalized query text (LRU)
+        self._understand_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.understand_cache_size = 512
         
-        # Conversation history
-        self.conversation_history: List[Dict[str, str]] = []
+        # Conversation history (oldest turns are evicted automatically)
         self.max_history = int(os.getenv("MAX_CONVERSATION_HISTORY", 5))
+        self.conversation_history: Deque[Dict[str, str]] = deque(maxlen=self.max_history)
     
     def chat(self, user_query: str) -> Dict[str, Any]:
         """
@@ -59,6 +66,9 @@ class SearchAgent:
         """
         print(f"\n🤖 Processing query: {user_query}")
         
+        # Start embedding the query now; it doesn't depend on the LLM output
+        query_vector_future = self._executor.submit(self.searcher.embed_query, user_query)
+        
         # Step 1: Understand the query using LLM
         query_analysis = self._understand_query(user_query)
         print(f"   Intent: {query_analysis['intent']}")
@@ -68,7 +78,8 @@ class SearchAgent:
             print(f"   Filters: {query_analysis['filters']}")
         
         # Step 2: Perform hybrid search
-        search_results = self.searcher.search(
+        search_results = self.searcher.search_with_vector(
+            query_vector=query_vector_future.result(),
             query=query_analysis['search_terms'],
             top_k=10,
             filters=query_analysis['filters']
@@ -97,8 +108,23 @@ class SearchAgent:
     def _understand_query(self, query: str) -> Dict[str, Any]:
         """
         Use LLM to understand query and extract structured information
+        
+        Queries whose filters are fully covered by the deterministic rules
+        in filter_rules are answered locally without calling the LLM.
         """
-        prompt = QUERY_UNDERSTANDING_PROMPT.format(query=query)
+        analysis = extract_filters(query)
+        if analysis is not None:
+            return analysis
+        
+        # The low-temperature JSON output is effectively deterministic,
+        # so identical queries reuse the previous analysis
+        cache_key = query.strip().lower()
+        cached = self._understand_cache.get(cache_key)
+        if cached is not None:
+            self._understand_cache.move_to_end(cache_key)
+            return copy.deepcopy(cached)
+        
+        prompt = render_query_understanding(query)
         
         try:
             response = self.model.generate_content(
@@ -109,7 +135,7 @@ class SearchAgent:
                 )
             )
             
-            analysis = json.loads(response.text)
+            analysis = orjson.loads(response.text)
             
             # Clean up filters (remove nulls)
             if 'filters' in analysis:
@@ -118,6 +144,10 @@ class SearchAgent:
                     if v is not None
                 }
             
+            self._understand_cache[cache_key] = copy.deepcopy(analysis)
+            if len(self._understand_cache) > self.understand_cache_size:
+                self._understand_cache.popitem(last=False)
+            
             return analysis
         
         except Exception as e:
@@ -142,14 +172,15 @@ class SearchAgent:
             return "I couldn't find any products matching your criteria. Could you try adjusting your requirements or search for something else?"
         
         # Format results for LLM
-        results_text = ""
-        for idx, result in enumerate(results[:5], 1):  # Top 5 results
-            results_text += f"\n{idx}. {result['title']}\n"
-            results_text += f"   Price: ${result['price']}\n"
-            results_text += f"   Rating: {result['rating']}/5\n"
-            results_text += f"   Description: {result['description'][:150]}...\n"
-        
-        prompt = RESPONSE_GENERATION_PROMPT.format(
+        results_text = "".join(
+            f"\n{idx}. {result['title']}\n"
+            f"   Price: ${result['price']}\n"
+            f"   Rating: {result['rating']}/5\n"
+            f"   Description: {result['description'][:150]}...\n"
+            for idx, result in enumerate(results[:5], 1)  # Top 5 results
+        )
+        
+        prompt = render_response_generation(
             query=user_query,
             intent=intent,
             results=results_text
@@ -173,14 +204,10 @@ class SearchAgent:
             'user': user_query,
             'agent': agent_response
         })
-        
-        # Keep only recent history
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
     
     def reset_conversation(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation_history.clear()
         print("🔄 Conversation reset")
 
 
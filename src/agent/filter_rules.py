@@ -0,0 +1,151 @@
+"""
+Rule-based filter extraction for common price and rating phrases
+
+Mirrors FILTER_EXTRACTION_EXAMPLES in prompts.py so predictable queries
+can be answered without a round trip to the LLM.
+"""
+import re
+from typing import Dict, Any, List, Optional
+
+# A number only counts as money when "$" or a currency word marks it;
+# "over 4 stars", "under 5" or "below 30 liters" are left to the LLM
+_PRICE = r'(\$\s*)?((?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?)(\s*(?:dollars?|bucks|usd)\b)?'
+
+PRICE_BETWEEN = re.compile(rf'\bbetween\s*{_PRICE}\s*(?:and|-|to)\s*{_PRICE}', re.I)
+PRICE_UNDER = re.compile(rf'(?:\b(?:under|less than|below|cheaper than)|<)\s*{_PRICE}', re.I)
+PRICE_OVER = re.compile(rf'(?:\b(?:over|more than|above)|>)\s*{_PRICE}', re.I)
+PRICE_AROUND = re.compile(rf'\b(?:around|about|roughly)\s*{_PRICE}', re.I)
+
+# Phrase -> (filter key, value)
+KEYWORD_MAP = {
+    'affordable': ('max_price', 50),
+    'budget': ('max_price', 75),
+    'premium': ('min_price', 200),
+    'cheap': ('max_price', 30),
+    'high quality': ('min_rating', 4.5),
+    'best rated': ('min_rating', 4.5),
+    'top rated': ('min_rating', 4.0),
+    'good reviews': ('min_rating', 4.0),
+    'good review': ('min_rating', 4.0),
+}
+# Whole words only; "budget-friendly" or "low-budget" is left to the LLM
+KEYWORD_RE = re.compile(
+    r'(?<![\w-])('
+    + '|'.join(sorted(map(re.escape, KEYWORD_MAP), key=len, reverse=True))
+    + r')(?![\w-])',
+    re.I
+)
+
+# Conversational phrasing that the rules cannot interpret reliably
+_NEEDS_LLM = re.compile(r'\?|\b(?:not|without|except|or|compared?|vs)\b', re.I)
+
+
+def _number(text: str):
+    value = float(text.replace(',', ''))
+    return int(value) if value.is_integer() else value
+
+
+def _amounts(match: re.Match) -> Optional[List]:
+    """Numbers in a price match, or None when nothing marks them as money"""
+    groups = match.groups()
+    # Each _PRICE contributes (currency sign, number, currency word)
+    parts = [groups[i:i + 3] for i in range(0, len(groups), 3)]
+    if not any(sign or word for sign, _, word in parts):
+        return None
+    return [_number(number) for _, number, _ in parts]
+
+
+def extract_filters(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract search terms and filters from a query using fixed rules
+
+    Args:
+        query: User's natural language query
+
+    Returns:
+        Query analysis in the same shape as the LLM output, or None when
+        no rule matched or the query is too ambiguous for the rules
+    """
+    if _NEEDS_LLM.search(query):
+        return None
+
+    filters: Dict[str, Any] = {}
+    remaining = query
+
+    def assign(key: str, value) -> bool:
+        # Two rules disagreeing on the same bound is ambiguous
+        if filters.get(key, value) != value:
+            return False
+        filters[key] = value
+        return True
+
+    for pattern in (PRICE_BETWEEN, PRICE_AROUND, PRICE_UNDER, PRICE_OVER):
+        for match in pattern.finditer(remaining):
+            amounts = _amounts(match)
+            if amounts is None:
+                # A comparison on stars, inches, pounds, ages, ...
+                return None
+
+            if pattern is PRICE_BETWEEN:
+                low, high = sorted(amounts)
+                bounds = {'min_price': low, 'max_price': high}
+            elif pattern is PRICE_AROUND:
+                price = amounts[0]
+                bounds = {'min_price': round(price * 0.8, 2), 'max_price': round(price * 1.2, 2)}
+            elif pattern is PRICE_UNDER:
+                bounds = {'max_price': amounts[0]}
+            else:
+                bounds = {'min_price': amounts[0]}
+
+            if not all(assign(k, v) for k, v in bounds.items()):
+                return None
+        remaining = pattern.sub(' ', remaining)
+
+    for match in KEYWORD_RE.finditer(remaining):
+        key, value = KEYWORD_MAP[match.group(1).lower()]
+        if not assign(key, value):
+            return None
+    remaining = KEYWORD_RE.sub(' ', remaining)
+
+    if not filters:
+        return None
+
+    if filters.get('min_price', 0) > filters.get('max_price', float('inf')):
+        return None
+
+    search_terms = ' '.join(remaining.split()) or query
+
+    return {
+        'search_terms': search_terms,
+        'filters': filters,
+        'intent': query
+    }
+
+
+if __name__ == "__main__":
+    # Quick checks on queries the rules should and shouldn't answer
+    expected = {
+        "laptop under $1000": {'max_price': 1000},
+        "tv under $1,000": {'max_price': 1000},
+        "sofa between $1,200 and $2,500.50": {'min_price': 1200, 'max_price': 2500.5},
+        "headphones under 50 bucks": {'max_price': 50},
+        "desk lamp between $20 and $40": {'min_price': 20, 'max_price': 40},
+        "blender between 30 and 60 dollars": {'min_price': 30, 'max_price': 60},
+        "affordable running shoes": {'max_price': 50},
+        # Keywords inside hyphenated words are not matched
+        "budget-friendly tablet": None,
+        "top rated coffee maker over $100": {'min_price': 100, 'min_rating': 4.0},
+        # Numbers without a currency marker are not prices
+        "headphones rated over 4 stars": None,
+        "coffee maker with more than 4 stars": None,
+        "tv over 55 inches": None,
+        "toys for kids under 5": None,
+        "jacket under 3 pounds": None,
+        "a backpack below 30 liters": None,
+    }
+
+    for query, filters in expected.items():
+        analysis = extract_filters(query)
+        actual = analysis['filters'] if analysis else None
+        assert actual == filters, f"{query!r}: expected {filters}, got {actual}"
+        print(f"✅ {query!r} → {actual}")
@@ -85,3 +85,37 @@ Examples of quality extraction:
 - "top rated" → min_rating: 4.0
 - "good review" → min_rating: 4.0
 """
+
+
+def _split_template(template: str, *fields: str) -> tuple:
+    """
+    Split a str.format template into its literal segments
+    
+    Placeholders must appear in the order given by ``fields``; escaped
+    ``{{``/``}}`` braces are unescaped so rendering is plain concatenation.
+    """
+    segments = []
+    rest = template
+    for field in fields:
+        head, rest = rest.split("{" + field + "}", 1)
+        segments.append(head)
+    segments.append(rest)
+    return tuple(s.replace("{{", "{").replace("}}", "}") for s in segments)
+
+
+_QUERY_UNDERSTANDING_SEGMENTS = _split_template(QUERY_UNDERSTANDING_PROMPT, "query")
+_RESPONSE_GENERATION_SEGMENTS = _split_template(
+    RESPONSE_GENERATION_PROMPT, "query", "intent", "results"
+)
+
+
+def render_query_understanding(query: str) -> str:
+    """Equivalent to QUERY_UNDERSTANDING_PROMPT.format(query=query)"""
+    prefix, suffix = _QUERY_UNDERSTANDING_SEGMENTS
+    return prefix + query + suffix
+
+
+def render_response_generation(query: str, intent: str, results: str) -> str:
+    """Equivalent to RESPONSE_GENERATION_PROMPT.format(query=..., intent=..., results=...)"""
+    s0, s1, s2, s3 = _RESPONSE_GENERATION_SEGMENTS
+    return "".join((s0, query, s1, intent, s2, results, s3))
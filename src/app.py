@@ -29,11 +29,13 @@ def print_results(results: list, max_results: int = 5):
     """Pretty print search results"""
     print(f"\n📦 Top {min(len(results), max_results)} Results:\n")
     
-    for idx, result in enumerate(results[:max_results], 1):
-        print(f"{idx}. {result['title']}")
-        print(f"   💰 ${result['price']:.2f} | ⭐ {result['rating']}/5 | 🏷️ {result['category']}")
-        print(f"   {result['description'][:100]}...")
-        print()
+    print("".join(
+        f"{idx}. {result['title']}\n"
+        f"   💰 ${result['price']:.2f} | ⭐ {result['rating']}/5 | 🏷️ {result['category']}\n"
+        f"   {result['description'][:100]}...\n"
+        f"\n"
+        for idx, result in enumerate(results[:max_results], 1)
+    ), end="")
 
 
 def main():
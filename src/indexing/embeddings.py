@@ -2,7 +2,11 @@
 Vector embedding generation using sentence transformers
 """
 import os
-from typing import List, Union
+import functools
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Union
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 
@@ -12,50 +16,152 @@ load_dotenv()
 class EmbeddingGenerator:
     """Generate vector embeddings for text using sentence transformers"""
     
-    def __init__(self, model_name: str = None):
+    def __init__(
+        self,
+        model_name: str = None,
+        backend: str = None,
+        model_path: str = None
+    ):
         """
         Initialize embedding generator
         
         Args:
             model_name: Name of the sentence transformer model
+            backend: Inference backend ("onnx", "openvino" or "torch")
+            model_path: Optional model file inside the model repo, e.g. an
+                int8-quantized "onnx/model_qint8_avx512_vnni.onnx"
         """
         self.model_name = model_name or os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
-        print(f"Loading embedding model: {self.model_name}")
-        self.model = SentenceTransformer(self.model_name)
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", "onnx")
+        self.model_path = model_path or os.getenv("EMBEDDING_MODEL_FILE")
+        self.verbose = bool(int(os.getenv("INDEXER_VERBOSE", "0")))
+        
+        model_kwargs = {"file_name": self.model_path} if self.model_path else None
+        print(f"Loading embedding model: {self.model_name} ({self.backend})")
+        self.model = SentenceTransformer(
+            self.model_name,
+            backend=self.backend,
+            model_kwargs=model_kwargs
+        )
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         print(f"✅ Model loaded. Embedding dimension: {self.embedding_dim}")
+        
+        # LRU cache of query embeddings, keyed by the exact query string.
+        # Guarded by a lock since searches may embed from worker threads.
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self.query_cache_size = int(os.getenv("QUERY_CACHE_SIZE", 512))
     
-    def encode(self, texts: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 128,
+        show_progress_bar: Optional[bool] = None
+    ) -> np.ndarray:
         """
         Generate embeddings for text(s)
         
         Args:
             texts: Single text string or list of texts
+            batch_size: Number of texts per model forward pass
+            show_progress_bar: Show a progress bar for lists of texts
+                (defaults to self.verbose)
             
         Returns:
-            Vector embedding(s) as list of floats
+            L2-normalized embedding(s) as a C-contiguous float32 numpy array
+            (one row per text), which orjson serializes without copying
         """
         if isinstance(texts, str):
             # Single text
-            embedding = self.model.encode(texts, convert_to_numpy=True)
-            return embedding.tolist()
+            embeddings = self.model.encode(
+                texts,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
         else:
             # Multiple texts
-            embeddings = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
-            return embeddings.tolist()
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=self.verbose if show_progress_bar is None else show_progress_bar
+            )
+        # No-op when the backend already returns contiguous float32
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
     
-    def encode_query(self, query: str) -> List[float]:
+    def encode_query(self, query: str) -> np.ndarray:
         """
         Generate embedding for search query
         
+        Repeated queries are served from an in-memory LRU cache. The cached
+        array is read-only because it is shared between callers.
+        
         Args:
             query: Search query text
             
         Returns:
             Query vector embedding
         """
-        return self.encode(query)
+        with self._query_cache_lock:
+            vector = self._query_cache.get(query)
+            if vector is not None:
+                self._query_cache.move_to_end(query)
+                return vector
+        
+        # Encode outside the lock so concurrent misses don't serialize
+        vector = self.encode(query)
+        vector.setflags(write=False)
+        with self._query_cache_lock:
+            self._query_cache[query] = vector
+            if len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
+    
+    def encode_query_batch(self, queries: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for several search queries at once
+        
+        Queries missing from the query cache are deduplicated and encoded
+        in a single batched model call, then added to the cache.
+        
+        Args:
+            queries: Search query texts
+            
+        Returns:
+            Read-only array of query embeddings, one row per query
+        """
+        cached = {}
+        with self._query_cache_lock:
+            for query in queries:
+                if query in self._query_cache:
+                    self._query_cache.move_to_end(query)
+                    cached[query] = self._query_cache[query]
+        
+        missing = [q for q in dict.fromkeys(queries) if q not in cached]
+        if missing:
+            vectors = self.encode(missing, show_progress_bar=False)
+            vectors.setflags(write=False)
+            with self._query_cache_lock:
+                for query, vector in zip(missing, vectors):
+                    cached[query] = vector
+                    self._query_cache[query] = vector
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        
+        if not queries:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        batch = np.stack([cached[q] for q in queries])
+        batch.setflags(write=False)
+        return batch
 
 
-# Singleton instance
-embedding_generator = EmbeddingGenerator()
+@functools.lru_cache(maxsize=1)
+def get_embedding_generator() -> EmbeddingGenerator:
+    """
+    Return the shared embedding generator, loading the model on first use
+    
+    Importing this module stays cheap; the model is only loaded once
+    something actually needs to embed text.
+    """
+    return EmbeddingGenerator()
@@ -1,25 +1,39 @@
 """
 Elasticsearch index creation and data indexing
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from elasticsearch import Elasticsearch, helpers
 from tqdm import tqdm
-import sys
+import logging
 import os
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-
 from config.elasticsearch import es_config
-from src.indexing.embeddings import embedding_generator
+from src.indexing.embeddings import get_embedding_generator
+
+logger = logging.getLogger(__name__)
 
 
 class ProductIndexer:
     """Index products with vector embeddings into Elasticsearch"""
     
-    def __init__(self):
+    def __init__(self, verbose: Optional[bool] = None):
+        """
+        Args:
+            verbose: Print indexing steps and show embedding progress bars
+                (defaults to INDEXER_VERBOSE)
+        """
         self.client = es_config.get_client()
         self.index_name = es_config.index_name
+        if verbose is None:
+            verbose = bool(int(os.getenv("INDEXER_VERBOSE", "0")))
+        self.verbose = verbose
+    
+    def _step(self, message: str):
+        """Report an indexing step: printed when verbose, else logged at INFO"""
+        if self.verbose:
+            print(message)
+        else:
+            logger.info(message)
         
     def create_index(self):
         """
@@ -50,24 +64,19 @@ class ProductIndexer:
                     "price": {"type": "float"},
                     "rating": {"type": "float"},
                     "tags": {"type": "keyword"},
-                    # Vector fields for semantic search
-                    "title_vector": {
-                        "type": "dense_vector",
-                        "dims": embedding_generator.embedding_dim,
-                        "index": True,
-                        "similarity": "cosine"
-                    },
-                    "description_vector": {
-                        "type": "dense_vector",
-                        "dims": embedding_generator.embedding_dim,
-                        "index": True,
-                        "similarity": "cosine"
-                    },
+                    # Vector field for semantic search. Embeddings are
+                    # L2-normalized, so dot_product equals cosine similarity;
+                    # int8_hnsw quantizes the HNSW graph at index time
                     "combined_vector": {
                         "type": "dense_vector",
-                        "dims": embedding_generator.embedding_dim,
+                        "dims": get_embedding_generator().embedding_dim,
                         "index": True,
-                        "similarity": "cosine"
+                        "similarity": "dot_product",
+                        "index_options": {
+                            "type": "int8_hnsw",
+                            "m": 16,
+                            "ef_construction": 100
+                        }
                     }
                 }
             }
@@ -90,42 +99,44 @@ class ProductIndexer:
         Args:
             products: List of product dictionaries
         """
-        print(f"\nIndexing {len(products)} products...")
+        self._step(f"Indexing {len(products)} products...")
         
         # Generate embeddings for all products
-        titles = [p['title'] for p in products]
-        descriptions = [p['description'] for p in products]
         combined_texts = [f"{p['title']}. {p['description']}" for p in products]
         
-        print("Generating title embeddings...")
-        title_vectors = embedding_generator.encode(titles)
-        
-        print("Generating description embeddings...")
-        description_vectors = embedding_generator.encode(descriptions)
+        self._step("Generating combined embeddings...")
+        combined_vectors = get_embedding_generator().encode(
+            combined_texts,
+            show_progress_bar=self.verbose
+        )
         
-        print("Generating combined embeddings...")
-        combined_vectors = embedding_generator.encode(combined_texts)
-        
-        # Prepare bulk indexing
-        actions = []
-        for idx, product in enumerate(products):
-            doc = {
-                **product,
-                "title_vector": title_vectors[idx],
-                "description_vector": description_vectors[idx],
-                "combined_vector": combined_vectors[idx]
-            }
-            
-            action = {
-                "_index": self.index_name,
-                "_id": product['id'],
-                "_source": doc
-            }
-            actions.append(action)
+        # Stream actions lazily so only one chunk is held per worker thread
+        def generate_actions():
+            for product, vector in zip(products, combined_vectors):
+                yield {
+                    "_index": self.index_name,
+                    "_id": product['id'],
+                    "_source": {
+                        **product,
+                        "combined_vector": vector
+                    }
+                }
         
         # Bulk index
-        print("Bulk indexing documents...")
-        success, failed = helpers.bulk(self.client, actions, raise_on_error=False)
+        self._step("Bulk indexing documents...")
+        success, failed = 0, 0
+        for ok, _ in helpers.parallel_bulk(
+            self.client,
+            generate_actions(),
+            chunk_size=500,
+            thread_count=4,
+            raise_on_error=False
+        ):
+            if ok:
+                success += 1
+            else:
+                failed += 1
+        
         print(f"✅ Indexed {success} products successfully")
         if failed:
             print(f"❌ Failed to index {failed} products")
@@ -0,0 +1,193 @@
+"""
+Result caching and batched execution shared by the search classes
+"""
+import copy
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from cachetools import TTLCache
+
+from config.elasticsearch import es_config
+from src.indexing.embeddings import get_embedding_generator
+from src.search._results import process_hits, response_hits
+from src.search.semantic_cache import SemanticCache
+
+
+class CachedSearch(ABC):
+    """
+    Base class for Elasticsearch searches driven by a query embedding
+
+    Puts two caches in front of Elasticsearch: a short-lived exact-match
+    cache of final results and a SemanticCache for near-identical query
+    embeddings. A search is identified by its query, top_k, one scoring
+    option (semantic_weight or min_score) and filters; subclasses turn
+    those into a request body in _build_search_body().
+    """
+
+    # filter_path for search and msearch responses (None returns everything)
+    _search_filter_path: Optional[List[str]] = None
+    _msearch_filter_path: Optional[List[str]] = None
+
+    def __init__(self):
+        self.client = es_config.get_client()
+        self.index_name = es_config.index_name
+        # An exact repeat is also a perfect semantic match, so a longer
+        # semantic TTL would keep serving results the exact-match cache
+        # has already expired
+        self._semantic_cache = SemanticCache(
+            capacity=es_config.semantic_cache_size,
+            threshold=es_config.semantic_cache_threshold,
+            ttl=min(es_config.semantic_cache_ttl, es_config.result_cache_ttl)
+        )
+        # Short-lived cache of final results for exact repeat searches
+        self._result_cache = TTLCache(
+            maxsize=es_config.result_cache_size,
+            ttl=es_config.result_cache_ttl
+        )
+        self._result_cache_lock = threading.RLock()
+
+    def invalidate(self):
+        """Drop all cached results, e.g. after the index has been rewritten"""
+        with self._result_cache_lock:
+            self._result_cache.clear()
+        self._semantic_cache.clear()
+
+    @abstractmethod
+    def _build_search_body(
+        self,
+        query: str,
+        query_vector: np.ndarray,
+        top_k: int,
+        option: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the search request body for one query"""
+
+    def _search(
+        self,
+        query_vector: np.ndarray,
+        query: str,
+        top_k: int,
+        option: float,
+        filters: Optional[Dict[str, Any]],
+        result_key: bytes
+    ) -> List[Dict[str, Any]]:
+        """Run a search that missed the exact-match result cache"""
+        # Reuse results from a near-identical earlier query
+        cache_key = self._semantic_key(top_k, option, filters)
+        results = self._semantic_cache.get(query_vector, cache_key)
+
+        if results is None:
+            response = self.client.search(
+                index=self.index_name,
+                filter_path=self._search_filter_path,
+                **self._build_search_body(query, query_vector, top_k, option, filters)
+            )
+            results = process_hits(response_hits(response.body), top_k)
+            self._semantic_cache.put(query_vector, cache_key, results)
+            # Only fresh results go in; re-caching a semantic hit would
+            # restart its TTL and let it outlive result_cache_ttl
+            self._cache_results(result_key, results)
+
+        return results
+
+    def _search_batch(
+        self,
+        queries: List[str],
+        top_k: int,
+        option: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches with one encoder call and one msearch request
+
+        Args:
+            queries: Search query texts
+            top_k: Number of results to return per query
+            option: Scoring option passed through to _build_search_body()
+            filters: Optional filters applied to every query
+
+        Returns:
+            List of result lists, in the same order as queries
+        """
+        results_by_query = {}
+        result_keys = {}
+        for query in dict.fromkeys(queries):
+            result_keys[query] = self._result_key(query, top_k, option, filters)
+            cached = self._get_cached_results(result_keys[query])
+            if cached is not None:
+                results_by_query[query] = cached
+
+        unique_queries = [q for q in result_keys if q not in results_by_query]
+        query_vectors = get_embedding_generator().encode_query_batch(unique_queries)
+        cache_key = self._semantic_key(top_k, option, filters)
+
+        pending = []
+        for query, query_vector in zip(unique_queries, query_vectors):
+            cached = self._semantic_cache.get(query_vector, cache_key)
+            if cached is not None:
+                results_by_query[query] = cached
+            else:
+                pending.append((query, query_vector))
+
+        if pending:
+            searches = []
+            for query, query_vector in pending:
+                searches.append({"index": self.index_name})
+                searches.append(
+                    self._build_search_body(query, query_vector, top_k, option, filters)
+                )
+
+            response = self.client.msearch(
+                searches=searches,
+                filter_path=self._msearch_filter_path
+            )
+            for (query, query_vector), item in zip(pending, response['responses']):
+                if 'error' in item:
+                    # Rerun on its own so the underlying error is raised
+                    results = self._search(
+                        query_vector, query, top_k, option, filters, result_keys[query]
+                    )
+                else:
+                    results = process_hits(response_hits(item), top_k)
+                    self._semantic_cache.put(query_vector, cache_key, results)
+                    self._cache_results(result_keys[query], results)
+                results_by_query[query] = results
+
+        return [list(results_by_query[query]) for query in queries]
+
+    @staticmethod
+    def _semantic_key(
+        top_k: int,
+        option: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> Tuple:
+        """Search parameters a semantic cache hit must have been stored with"""
+        return (top_k, option, tuple(sorted(filters.items())) if filters else None)
+
+    @staticmethod
+    def _result_key(
+        query: str,
+        top_k: int,
+        option: float,
+        filters: Optional[Dict[str, Any]],
+        query_vector: Optional[np.ndarray] = None
+    ) -> bytes:
+        """Compact digest identifying an exact search request"""
+        params = (query, sorted(filters.items()) if filters else None, top_k, option)
+        digest = hashlib.blake2b(repr(params).encode(), digest_size=16)
+        if query_vector is not None:
+            digest.update(np.asarray(query_vector, dtype=np.float32).tobytes())
+        return digest.digest()
+
+    def _get_cached_results(self, key: bytes) -> Optional[List[Dict[str, Any]]]:
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+        # Shallow copy so callers can't mutate the cached list
+        return copy.copy(cached) if cached is not None else None
+
+    def _cache_results(self, key: bytes, results: List[Dict[str, Any]]):
+        with self._result_cache_lock:
+            self._result_cache[key] = copy.copy(results)
@@ -0,0 +1,45 @@
+"""
+Shared Elasticsearch filter clause builder for the search classes
+"""
+from typing import List, Dict, Any
+
+# Filter key -> (document field, range operator)
+_RANGE_FILTERS = {
+    'min_price': ('price', 'gte'),
+    'max_price': ('price', 'lte'),
+    'min_rating': ('rating', 'gte'),
+}
+
+# Filter key -> document field matched with a term query
+_TERM_FILTERS = {
+    'category': 'category',
+    'brand': 'brand',
+}
+
+
+def build_filter_clauses(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Build Elasticsearch filter clauses from a filter dict
+
+    Args:
+        filters: Dictionary of filters, unknown keys are ignored
+
+    Returns:
+        List of term/range queries, usable directly as a bool or kNN filter
+    """
+    clauses = []
+    ranges: Dict[str, Dict[str, Any]] = {}
+
+    for key, value in filters.items():
+        if key in _RANGE_FILTERS:
+            field, op = _RANGE_FILTERS[key]
+            # Bounds on the same field share one range query
+            bounds = ranges.get(field)
+            if bounds is None:
+                bounds = ranges[field] = {}
+                clauses.append({"range": {field: bounds}})
+            bounds[op] = value
+        elif key in _TERM_FILTERS:
+            clauses.append({"term": {_TERM_FILTERS[key]: value}})
+
+    return clauses
@@ -0,0 +1,57 @@
+"""
+Shared conversion of Elasticsearch hits into search result dicts
+"""
+from itertools import islice
+from operator import itemgetter
+from typing import List, Dict, Any
+
+_get_id = itemgetter('_id')
+_get_score = itemgetter('_score')
+_get_source = itemgetter('_source')
+
+# Document fields returned with every result. Requested as an explicit
+# _source allow-list, which is cheaper than a wildcard exclude; the
+# document id comes from the hit's _id
+SOURCE_FIELDS = ["title", "description", "category", "brand", "price", "rating", "tags"]
+
+
+def response_hits(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Hits list from a search response body or msearch item
+
+    Responses trimmed with filter_path omit "hits" when nothing matched.
+    """
+    return body.get('hits', {}).get('hits', [])
+
+
+def process_hits(hits: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Convert Elasticsearch hits into result dicts
+
+    Every result has the same keys in the same order, so CPython can share
+    one key table between them instead of merging each _source.
+
+    Args:
+        hits: Hits from a search response
+        top_k: Maximum number of results to return
+
+    Returns:
+        List of result dicts with id, score and SOURCE_FIELDS
+    """
+    # Pure dict reshaping with no numeric work (RRF and rescoring run inside
+    # Elasticsearch), so there is nothing here for Numba/Cython to compile
+    results = []
+    for hit in islice(hits, top_k):
+        src = _get_source(hit)
+        results.append({
+            'id': _get_id(hit),
+            'score': _get_score(hit),
+            'title': src.get('title'),
+            'description': src.get('description'),
+            'category': src.get('category'),
+            'brand': src.get('brand'),
+            'price': src.get('price'),
+            'rating': src.get('rating'),
+            'tags': src.get('tags'),
+        })
+    return results
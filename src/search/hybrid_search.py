@@ -1,26 +1,138 @@
 """
 Hybrid search combining BM25 (keyword) and kNN (semantic) search
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+import orjson
 from elasticsearch import Elasticsearch
-import sys
-import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from src.indexing.embeddings import get_embedding_generator
+from src.search._cached_search import CachedSearch
+from src.search._filters import build_filter_clauses
+from src.search._results import SOURCE_FIELDS, process_hits, response_hits
 
-from config.elasticsearch import es_config
-from src.indexing.embeddings import embedding_generator
+# Constant parts of the request body, shared by every search (never mutated)
+_KEYWORD_FIELDS = ["title^3", "description^2", "tags"]
+# RRF k: score = sum(1 / (k + rank)). 60 is the value Cormack et al. (2009)
+# found to work best across collections; it is also Elasticsearch's default
+_RANK_CONSTANT = 60
+# Trim responses down to the hit fields process_hits() reads, so the
+# _shards/took/total wrappers are never sent, decoded or allocated
+_SEARCH_FILTER_PATH = ["hits.hits._id", "hits.hits._score", "hits.hits._source"]
+# status is kept so every msearch item survives filtering and stays aligned
+_MSEARCH_FILTER_PATH = [
+    "responses.status",
+    "responses.error",
+    "responses.hits.hits._id",
+    "responses.hits.hits._score",
+    "responses.hits.hits._source",
+]
 
 
-class HybridSearch:
+# Stored search template with the same shape as _build_search_body(), so
+# repeated searches only send their parameters (see search_template_batch)
+_TEMPLATE_ID = "hybrid-v1"
+_TEMPLATE_SOURCE = """{
+  "query": {
+    "bool": {
+      "should": [
+        {
+          "multi_match": {
+            "query": {{#toJson}}query{{/toJson}},
+            "fields": %(fields)s,
+            "type": "best_fields",
+            "fuzziness": "AUTO"
+          }
+        }
+      ],
+      "filter": {{#toJson}}filter{{/toJson}}
+    }
+  },
+  "knn": {
+    "field": "combined_vector",
+    "query_vector": {{#toJson}}query_vector{{/toJson}},
+    "k": {{top_k}},
+    "num_candidates": {{num_candidates}},
+    "filter": {{#toJson}}filter{{/toJson}}
+  },
+  "size": {{top_k}},
+  "_source": %(source)s,
+  "track_total_hits": false,
+  "rank": {
+    "rrf": {
+      "window_size": {{window_size}},
+      "rank_constant": %(rank_constant)d
+    }
+  }
+}""" % {
+    "fields": orjson.dumps(_KEYWORD_FIELDS).decode(),
+    "source": orjson.dumps(SOURCE_FIELDS).decode(),
+    "rank_constant": _RANK_CONSTANT,
+}
+
+
+def _rank_windows(top_k: int) -> Tuple[int, int]:
+    """RRF window size and kNN candidate count for a page of top_k results"""
+    # Keep the RRF window close to top_k so Elasticsearch only ranks and
+    # hydrates the documents that can actually make the final page, and
+    # never let it exceed the kNN candidate pool feeding it
+    window_size = max(top_k, 20)
+    return window_size, max(window_size, top_k * 4)
+
+
+class HybridSearch(CachedSearch):
     """
     Hybrid search combining traditional keyword search (BM25) 
     with semantic vector search (kNN) using Reciprocal Rank Fusion (RRF)
     """
     
-    def __init__(self):
-        self.client = es_config.get_client()
-        self.index_name = es_config.index_name
+    _search_filter_path = _SEARCH_FILTER_PATH
+    _msearch_filter_path = _MSEARCH_FILTER_PATH
+    
+    def __init__(self, warmup: bool = False):
+        """
+        Args:
+            warmup: Load the model and touch the index now (see warmup())
+        """
+        super().__init__()
+        self._template_registered = False
+        
+        if warmup:
+            self.warmup()
+    
+    def warmup(self):
+        """
+        Pay cold-start costs up front instead of on the first user search
+        
+        Loads the embedding model, fills the first query cache slot and runs
+        one cheap kNN query so Elasticsearch pages in the HNSW graph.
+        Failures only print a warning; the first real search retries them.
+        """
+        try:
+            query_vector = self.embed_query("warmup")
+            self.client.search(
+                index=self.index_name,
+                knn={
+                    "field": "combined_vector",
+                    "query_vector": query_vector,
+                    "k": 1,
+                    "num_candidates": 10
+                },
+                size=1,
+                source=False,
+                track_total_hits=False
+            )
+        except Exception as e:
+            print(f"⚠️ Search warmup failed: {e}")
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Generate the query embedding used for the semantic (kNN) half of the search
+        
+        Exposed separately so callers can compute it concurrently with
+        other work and pass it to search_with_vector().
+        """
+        return get_embedding_generator().encode_query(query)
     
     def search(
         self,
@@ -41,9 +153,162 @@ class HybridSearch:
         Returns:
             List of search results with combined scores
         """
-        # Generate query embedding for semantic search
-        query_vector = embedding_generator.encode_query(query)
+        # Exact repeats skip both the encoder and Elasticsearch
+        result_key = self._result_key(query, top_k, semantic_weight, filters)
+        cached = self._get_cached_results(result_key)
+        if cached is not None:
+            return cached
+        
+        return self._search(
+            self.embed_query(query), query, top_k, semantic_weight, filters, result_key
+        )
+    
+    def search_with_vector(
+        self,
+        query_vector: np.ndarray,
+        query: str,
+        top_k: int = 10,
+        semantic_weight: float = 0.5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Perform hybrid search with a precomputed query embedding
+        
+        Args:
+            query_vector: Embedding for the kNN search, see embed_query()
+            query: Search query text for the keyword (BM25) search
+            top_k: Number of results to return
+            semantic_weight: Weight for semantic search (0-1), keyword weight = 1 - semantic_weight
+            filters: Optional filters
+            
+        Returns:
+            List of search results with combined scores
+        """
+        # The vector need not come from query (the agent embeds the raw user
+        # query but searches the LLM's terms), so it is part of the key
+        result_key = self._result_key(query, top_k, semantic_weight, filters, query_vector)
+        cached = self._get_cached_results(result_key)
+        if cached is not None:
+            return cached
+        
+        return self._search(query_vector, query, top_k, semantic_weight, filters, result_key)
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        semantic_weight: float = 0.5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Perform hybrid search for several queries in one round trip
+        
+        Embeds all queries in a single batched model call and sends the
+        uncached searches to Elasticsearch as one msearch request.
+        
+        Args:
+            queries: Search query texts
+            top_k: Number of results to return per query
+            semantic_weight: Weight for semantic search (0-1), keyword weight = 1 - semantic_weight
+            filters: Optional filters applied to every query
+            
+        Returns:
+            List of result lists, in the same order as queries
+        """
+        return self._search_batch(queries, top_k, semantic_weight, filters)
+    
+    def search_template_batch(
+        self,
+        queries_with_params: List[Tuple[str, Optional[Dict[str, Any]]]],
+        top_k: int = 10,
+        semantic_weight: float = 0.5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Perform hybrid searches through the stored search template
+        
+        All queries are embedded in one batched model call and sent as a
+        single msearch_template request. Only each query's parameters go
+        over the wire, and Elasticsearch reuses the parsed template. Results
+        always come from Elasticsearch and are not cached, which suits
+        benchmark and evaluation runs.
+        
+        Args:
+            queries_with_params: (query, filters) pairs, filters may be None
+            top_k: Number of results to return per query
+            semantic_weight: Weight for semantic search (0-1), keyword weight = 1 - semantic_weight
+            
+        Returns:
+            List of result lists, in the same order as queries_with_params
+        """
+        if not queries_with_params:
+            return []
+        
+        self._register_template()
+        window_size, num_candidates = _rank_windows(top_k)
+        query_vectors = get_embedding_generator().encode_query_batch(
+            [query for query, _ in queries_with_params]
+        )
+        
+        search_templates = []
+        for (query, filters), query_vector in zip(queries_with_params, query_vectors):
+            search_templates.append({"index": self.index_name})
+            search_templates.append({
+                "id": _TEMPLATE_ID,
+                "params": {
+                    "query": query,
+                    "query_vector": query_vector,
+                    "filter": build_filter_clauses(filters) if filters else [],
+                    "top_k": top_k,
+                    "window_size": window_size,
+                    "num_candidates": num_candidates
+                }
+            })
+        
+        response = self.client.msearch_template(
+            search_templates=search_templates,
+            filter_path=_MSEARCH_FILTER_PATH
+        )
+        
+        batch_results = []
+        for (query, filters), query_vector, item in zip(
+            queries_with_params, query_vectors, response['responses']
+        ):
+            if 'error' in item:
+                # Rerun as a plain search (still uncached) so the underlying
+                # error is raised
+                fallback = self.client.search(
+                    index=self.index_name,
+                    filter_path=_SEARCH_FILTER_PATH,
+                    **self._build_search_body(query, query_vector, top_k, semantic_weight, filters)
+                )
+                item = fallback.body
+            batch_results.append(process_hits(response_hits(item), top_k))
+        return batch_results
+    
+    def _register_template(self):
+        """Store the hybrid search template on the cluster (once per instance)"""
+        if self._template_registered:
+            return
+        self.client.put_script(
+            id=_TEMPLATE_ID,
+            script={"lang": "mustache", "source": _TEMPLATE_SOURCE}
+        )
+        self._template_registered = True
+    
+    def _build_search_body(
+        self,
+        query: str,
+        query_vector: np.ndarray,
+        top_k: int,
+        semantic_weight: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Build the hybrid (BM25 + kNN + RRF) search request body
         
+        RRF fuses by rank, so semantic_weight does not change the body; it
+        only keeps cached results for different weights apart.
+        """
         # Build keyword search query (BM25)
         keyword_query = {
             "bool": {
@@ -51,7 +316,7 @@ class HybridSearch:
                     {
                         "multi_match": {
                             "query": query,
-                            "fields": ["title^3", "description^2", "tags"],
+                            "fields": _KEYWORD_FIELDS,
                             "type": "best_fields",
                             "fuzziness": "AUTO"
                         }
@@ -60,87 +325,49 @@ class HybridSearch:
             }
         }
         
-        # Add filters to keyword query
-        if filters:
-            keyword_query["bool"]["filter"] = self._build_filters(filters)
+        window_size, num_candidates = _rank_windows(top_k)
         
         # Build kNN query for semantic search
         knn_query = {
             "field": "combined_vector",
             "query_vector": query_vector,
             "k": top_k,
-            "num_candidates": top_k * 3
+            "num_candidates": num_candidates
         }
         
-        # Add same filters to kNN
-        if filters:
-            knn_query["filter"] = self._build_filters(filters)
+        # Build the filter clauses once and share them between both queries
+        filter_clauses = build_filter_clauses(filters) if filters else None
+        if filter_clauses:
+            keyword_query["bool"]["filter"] = filter_clauses
+            knn_query["filter"] = filter_clauses
         
-        # Execute hybrid search using Elasticsearch's native RRF
         # Note: In production, you might use custom scoring
-        response = self.client.search(
-            index=self.index_name,
-            query=keyword_query,
-            knn=knn_query,
-            size=top_k,
-            _source={
-                "excludes": ["*_vector"]
-            },
+        return {
+            "query": keyword_query,
+            "knn": knn_query,
+            "size": top_k,
+            "_source": SOURCE_FIELDS,
+            # The hit count is never shown, so skip counting it
+            "track_total_hits": False,
             # Elasticsearch automatically combines scores
-            rank={
+            "rank": {
                 "rrf": {
-                    "window_size": 50,
-                    "rank_constant": 20
+                    "window_size": window_size,
+                    "rank_constant": _RANK_CONSTANT
                 }
             }
-        )
-        
-        # Process results
-        results = []
-        for hit in response['hits']['hits']:
-            result = {
-                'id': hit['_id'],
-                'score': hit['_score'],
-                **hit['_source']
-            }
-            results.append(result)
-        
-        return results
-    
-    def _build_filters(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Build Elasticsearch filter queries"""
-        must_clauses = []
-        
-        if 'min_price' in filters or 'max_price' in filters:
-            range_filter = {"range": {"price": {}}}
-            if 'min_price' in filters:
-                range_filter["range"]["price"]["gte"] = filters['min_price']
-            if 'max_price' in filters:
-                range_filter["range"]["price"]["lte"] = filters['max_price']
-            must_clauses.append(range_filter)
-        
-        if 'category' in filters:
-            must_clauses.append({"term": {"category": filters['category']}})
-        
-        if 'brand' in filters:
-            must_clauses.append({"term": {"brand": filters['brand']}})
-        
-        if 'min_rating' in filters:
-            must_clauses.append({"range": {"rating": {"gte": filters['min_rating']}}})
-        
-        return must_clauses
+        }
     
     def explain_search(self, query: str, doc_id: str) -> Dict[str, Any]:
         """
         Explain why a document matched the hybrid query
         Useful for debugging and understanding search behavior
         """
-        query_vector = embedding_generator.encode_query(query)
-        
+        # Explain covers the keyword (BM25) half only, so no embedding is needed
         keyword_query = {
             "multi_match": {
                 "query": query,
-                "fields": ["title^3", "description^2", "tags"]
+                "fields": _KEYWORD_FIELDS
             }
         }
         
@@ -163,11 +390,13 @@ if __name__ == "__main__":
         ("coffee gift", {"min_rating": 4.5})
     ]
     
-    for query, filters in test_queries:
+    # Run all test queries through the stored template in one round trip
+    batch_results = searcher.search_template_batch(test_queries, top_k=3)
+    
+    for (query, filters), results in zip(test_queries, batch_results):
         print(f"\n🔍 Hybrid Search: {query}")
         if filters:
             print(f"   Filters: {filters}")
-        results = searcher.search(query, top_k=3, filters=filters)
         for idx, result in enumerate(results, 1):
             print(f"  {idx}. {result['title']} (score: {result['score']:.3f})")
             print(f"     ${result['price']} | ⭐ {result['rating']}")
@@ -0,0 +1,122 @@
+"""
+Semantic result cache keyed by query embedding similarity
+"""
+import threading
+import time
+from typing import List, Dict, Any, Optional, Hashable
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:  # optional; NumPy BLAS is used instead
+    simsimd = None
+
+
+class SemanticCache:
+    """
+    Cache of search results for recently seen query embeddings
+
+    A lookup hits when a cached query's embedding has cosine similarity
+    >= threshold with the new one and was stored with the same search
+    parameters, so paraphrased queries ("winter jacket hiking" vs
+    "hiking winter jacket") reuse the earlier results.
+
+    Embeddings live in one contiguous (capacity x dim) float32 matrix, so
+    a lookup is a single SIMD cosine pass (SimSIMD when installed, else a
+    NumPy BLAS matrix-vector product). Entries expire after ttl seconds;
+    when full, the least recently used slot is replaced.
+    """
+
+    def __init__(self, capacity: int = 256, threshold: float = 0.97, ttl: float = 60.0):
+        """
+        Args:
+            capacity: Maximum number of cached queries
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds before an entry is considered stale
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            # Allocated on first put(), once the embedding dimension is known
+            self._matrix: Optional[np.ndarray] = None
+            self._norms = np.zeros(self.capacity, dtype=np.float32)
+            # Slots are filled in order, so rows [0, _filled) are in use
+            self._filled = 0
+            self._created = np.zeros(self.capacity)
+            self._last_used = np.zeros(self.capacity)
+            self._entries: List[Optional[tuple]] = [None] * self.capacity
+
+    def get(self, vector: np.ndarray, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up results for a query embedding
+
+        Args:
+            vector: Query embedding
+            key: Search parameters the results must have been stored with
+
+        Returns:
+            Copy of the cached results list, or None on a miss
+        """
+        with self._lock:
+            if self._matrix is None or not self.capacity:
+                self.misses += 1
+                return None
+
+            now = time.monotonic()
+            scores = np.full(self.capacity, -np.inf)
+            scores[:self._filled] = self._cosine_scores(vector, self._filled)
+            scores[now - self._created >= self.ttl] = -np.inf
+
+            candidates = np.flatnonzero(scores >= self.threshold)
+            for slot in candidates[np.argsort(-scores[candidates])]:
+                entry_key, results = self._entries[slot]
+                if entry_key == key:
+                    self._last_used[slot] = now
+                    self.hits += 1
+                    return list(results)
+
+            self.misses += 1
+            return None
+
+    def put(self, vector: np.ndarray, key: Hashable, results: List[Dict[str, Any]]):
+        """
+        Store results for a query embedding
+
+        Args:
+            vector: Query embedding
+            key: Search parameters used to produce the results
+            results: Search results to cache
+        """
+        if not self.capacity:
+            return
+
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, vector.shape[-1]), dtype=np.float32)
+
+            # Fill empty slots first, then evict the least recently used
+            slot = int(np.argmin(self._last_used))
+            now = time.monotonic()
+            self._matrix[slot] = vector
+            self._norms[slot] = np.linalg.norm(vector)
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._entries[slot] = (key, list(results))
+            self._filled = max(self._filled, slot + 1)
+
+    def _cosine_scores(self, vector: np.ndarray, count: int) -> np.ndarray:
+        """Cosine similarity of vector against the first count cached slots"""
+        matrix = self._matrix[:count]
+        if simsimd is not None:
+            query = np.ascontiguousarray(vector, dtype=np.float32)
+            distances = np.asarray(simsimd.cdist(query[np.newaxis, :], matrix, metric="cosine"))
+            return 1.0 - distances.reshape(-1)
+        return (matrix @ vector) / (self._norms[:count] * np.linalg.norm(vector))
@@ -2,23 +2,18 @@
 Vector search implementation using Elasticsearch kNN
 """
 from typing import List, Dict, Any, Optional
+import numpy as np
 from elasticsearch import Elasticsearch
-import sys
-import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from src.indexing.embeddings import get_embedding_generator
+from src.search._cached_search import CachedSearch
+from src.search._filters import build_filter_clauses
+from src.search._results import SOURCE_FIELDS
 
-from config.elasticsearch import es_config
-from src.indexing.embeddings import embedding_generator
 
-
-class VectorSearch:
+class VectorSearch(CachedSearch):
     """Semantic search using vector embeddings and kNN"""
     
-    def __init__(self):
-        self.client = es_config.get_client()
-        self.index_name = es_config.index_name
-    
     def search(
         self,
         query: str,
@@ -38,80 +33,91 @@ class VectorSearch:
         Returns:
             List of search results with scores
         """
-        # Generate query embedding
-        query_vector = embedding_generator.encode_query(query)
-        
-        # Build kNN query
-        knn_query = {
-            "field": "combined_vector",
-            "query_vector": query_vector,
-            "k": top_k,
-            "num_candidates": top_k * 2  # Oversample for better recall
-        }
-        
-        # Add filters if provided
-        if filters:
-            knn_query["filter"] = self._build_filters(filters)
-        
-        # Execute search
-        response = self.client.search(
-            index=self.index_name,
-            knn=knn_query,
-            size=top_k,
-            _source={
-                "excludes": ["*_vector"]  # Don't return vectors in results
-            }
-        )
-        
-        # Process results
-        results = []
-        for hit in response['hits']['hits']:
-            if hit['_score'] >= min_score:
-                result = {
-                    'id': hit['_id'],
-                    'score': hit['_score'],
-                    **hit['_source']
-                }
-                results.append(result)
+        # Exact repeats skip both the encoder and Elasticsearch
+        result_key = self._result_key(query, top_k, min_score, filters)
+        cached = self._get_cached_results(result_key)
+        if cached is not None:
+            return cached
         
-        return results
+        # Generate query embedding
+        query_vector = get_embedding_generator().encode_query(query)
+        return self._search(query_vector, query, top_k, min_score, filters, result_key)
     
-    def _build_filters(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        min_score: float = 0.5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
         """
-        Build Elasticsearch filter query from filter dict
+        Perform semantic vector search for several queries in one round trip
+        
+        Embeds all queries in a single batched model call and sends the
+        uncached searches to Elasticsearch as one msearch request.
         
         Args:
-            filters: Dictionary of filters
+            queries: Search query texts
+            top_k: Number of results to return per query
+            min_score: Minimum similarity score threshold
+            filters: Optional filters applied to every query
             
         Returns:
-            Elasticsearch filter query
+            List of result lists, in the same order as queries
         """
-        must_clauses = []
-        
-        # Price range filter
-        if 'min_price' in filters or 'max_price' in filters:
-            range_filter = {"range": {"price": {}}}
-            if 'min_price' in filters:
-                range_filter["range"]["price"]["gte"] = filters['min_price']
-            if 'max_price' in filters:
-                range_filter["range"]["price"]["lte"] = filters['max_price']
-            must_clauses.append(range_filter)
-        
-        # Category filter
-        if 'category' in filters:
-            must_clauses.append({"term": {"category": filters['category']}})
+        return self._search_batch(queries, top_k, min_score, filters)
+    
+    def _build_search_body(
+        self,
+        query: str,
+        query_vector: np.ndarray,
+        top_k: int,
+        min_score: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the kNN search request body (the query text is not used)"""
+        # The int8_hnsw graph scores candidates with quantized vectors, so
+        # fetch extra hits and rescore them against the full-precision ones
+        rescore_window = top_k * 3
         
-        # Brand filter
-        if 'brand' in filters:
-            must_clauses.append({"term": {"brand": filters['brand']}})
+        # Build kNN query. The score threshold is applied by Elasticsearch:
+        # for dot_product fields _score = (1 + similarity) / 2, so convert
+        # min_score back to the raw similarity the kNN option expects
+        knn_query = {
+            "field": "combined_vector",
+            "query_vector": query_vector,
+            "k": rescore_window,
+            "num_candidates": rescore_window * 2,  # Oversample for better recall
+            "similarity": 2 * min_score - 1
+        }
         
-        # Rating filter
-        if 'min_rating' in filters:
-            must_clauses.append({
-                "range": {"rating": {"gte": filters['min_rating']}}
-            })
+        # Add filters if provided
+        filter_clauses = build_filter_clauses(filters) if filters else None
+        if filter_clauses:
+            knn_query["filter"] = filter_clauses
         
-        return {"bool": {"must": must_clauses}} if must_clauses else {}
+        return {
+            "knn": knn_query,
+            "size": top_k,
+            "_source": SOURCE_FIELDS,
+            # Exact float dot product, mapped to the same (1 + sim) / 2 scale
+            "rescore": {
+                "window_size": rescore_window,
+                "query": {
+                    "rescore_query": {
+                        "script_score": {
+                            "query": {"match_all": {}},
+                            "script": {
+                                "source": "(dotProduct(params.query_vector, 'combined_vector') + 1.0) / 2.0",
+                                "params": {"query_vector": query_vector}
+                            }
+                        }
+                    },
+                    "query_weight": 0.0,
+                    "rescore_query_weight": 1.0
+                }
+            }
+        }
 
 
 if __name__ == "__main__":
@@ -124,9 +130,11 @@ if __name__ == "__main__":
         "gifts for coffee lovers"
     ]
     
-    for query in test_queries:
+    # Embed and search all test queries in one batch
+    batch_results = searcher.search_batch(test_queries, top_k=3)
+    
+    for query, results in zip(test_queries, batch_results):
         print(f"\n🔍 Query: {query}")
-        results = searcher.search(query, top_k=3)
         for idx, result in enumerate(results, 1):
             print(f"  {idx}. {result['title']} (score: {result['score']:.3f})")
             print(f"     Price: ${result['price']}, Rating: {result['rating']}")